@@ -0,0 +1,33 @@
+using AIChaos.Brain.Models;
+
+namespace AIChaos.Brain.Tests.Models;
+
+public class AppSettingsTests
+{
+    [Theory]
+    [InlineData("imgur.com")]
+    [InlineData("i.imgur.com")]
+    [InlineData("I.IMGUR.COM")]
+    [InlineData("cdn.i.imgur.com")]
+    public void SafetySettings_IsDomainAllowed_AcceptsAllowedDomainsAndSubdomains(string host)
+    {
+        // Arrange
+        var safety = new SafetySettings();
+
+        // Act & Assert
+        Assert.True(safety.IsDomainAllowed(host));
+    }
+
+    [Theory]
+    [InlineData("evilimgur.com")]
+    [InlineData("imgur.com.evil.net")]
+    [InlineData("example.com")]
+    public void SafetySettings_IsDomainAllowed_RejectsLookalikeDomains(string host)
+    {
+        // Arrange
+        var safety = new SafetySettings();
+
+        // Act & Assert
+        Assert.False(safety.IsDomainAllowed(host));
+    }
+}
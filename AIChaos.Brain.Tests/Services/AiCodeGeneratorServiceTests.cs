@@ -0,0 +1,174 @@
+using System.Net;
+using System.Text.Json;
+using AIChaos.Brain.Models;
+using AIChaos.Brain.Services;
+using Microsoft.Extensions.Logging;
+using Moq;
+
+namespace AIChaos.Brain.Tests.Services;
+
+public class AiCodeGeneratorServiceTests
+{
+    private sealed class ChatCompletionHandler(params string[] replies) : HttpMessageHandler
+    {
+        public int Calls { get; private set; }
+
+        protected override Task<HttpResponseMessage> SendAsync(HttpRequestMessage request, CancellationToken cancellationToken)
+        {
+            var reply = replies[Math.Min(Calls, replies.Length - 1)];
+            Calls++;
+
+            var body = JsonSerializer.Serialize(new
+            {
+                choices = new[] { new { message = new { content = reply } } }
+            });
+            return Task.FromResult(new HttpResponseMessage(HttpStatusCode.OK) { Content = new StringContent(body) });
+        }
+    }
+
+    private static (AiCodeGeneratorService Service, CommandQueueService Queue) CreateService(ChatCompletionHandler handler, bool includeHistory = false)
+    {
+        var mockFactory = new Mock<IHttpClientFactory>();
+        mockFactory.Setup(f => f.CreateClient(Constants.OpenRouterHttpClient)).Returns(new HttpClient(handler));
+
+        var settingsService = new SettingsService(new Mock<ILogger<SettingsService>>().Object);
+        var commandQueue = new CommandQueueService();
+        commandQueue.Preferences.IncludeHistoryInAi = includeHistory;
+
+        var service = new AiCodeGeneratorService(
+            mockFactory.Object,
+            settingsService,
+            commandQueue,
+            new Mock<ILogger<AiCodeGeneratorService>>().Object);
+        return (service, commandQueue);
+    }
+
+    [Fact]
+    public async Task GenerateCodeAsync_ReusesResponse_ForRepeatedRequest()
+    {
+        // Arrange
+        var handler = new ChatCompletionHandler("print('hi')\n---UNDO---\nprint('bye')");
+        var (service, _) = CreateService(handler);
+
+        // Act
+        var first = await service.GenerateCodeAsync("Say hi");
+        var second = await service.GenerateCodeAsync("  say HI ");
+
+        // Assert
+        Assert.Equal(1, handler.Calls);
+        Assert.Equal("print('hi')", second.ExecutionCode);
+        Assert.Equal(first.UndoCode, second.UndoCode);
+    }
+
+    [Fact]
+    public async Task GenerateCodeAsync_DoesNotReuseResponse_WhenHistoryContextDiffers()
+    {
+        // Arrange
+        var handler = new ChatCompletionHandler("print('first')", "print('second')");
+        var (service, commandQueue) = CreateService(handler, includeHistory: true);
+
+        // Act
+        await service.GenerateCodeAsync("Do that again");
+        commandQueue.AddCommand("spawn a headcrab", "code", "undo");
+        var result = await service.GenerateCodeAsync("Do that again");
+
+        // Assert
+        Assert.Equal(2, handler.Calls);
+        Assert.Equal("print('second')", result.ExecutionCode);
+    }
+
+    [Fact]
+    public async Task GenerateCodeAsync_SkipsCache_WhenHistoryIsIncluded()
+    {
+        // Arrange
+        var handler = new ChatCompletionHandler("print('first')", "print('second')");
+        var (service, commandQueue) = CreateService(handler, includeHistory: true);
+        commandQueue.AddCommand("spawn a headcrab", "code", "undo");
+
+        // Act
+        await service.GenerateCodeAsync("Say hi");
+        var result = await service.GenerateCodeAsync("Say hi");
+
+        // Assert
+        Assert.Equal(2, handler.Calls);
+        Assert.Equal("print('second')", result.ExecutionCode);
+    }
+
+    [Fact]
+    public async Task GenerateCodeAsync_DoesNotCacheBlockedResponse()
+    {
+        // Arrange
+        var handler = new ChatCompletionHandler("RunConsoleCommand(\"changelevel\", \"d1_trainstation_01\")", "print('safe')");
+        var (service, _) = CreateService(handler);
+
+        // Act
+        var blocked = await service.GenerateCodeAsync("Change the map");
+        var retried = await service.GenerateCodeAsync("Change the map");
+
+        // Assert
+        Assert.StartsWith("print(\"[BLOCKED]", blocked.ExecutionCode);
+        Assert.Equal(2, handler.Calls);
+        Assert.Equal("print('safe')", retried.ExecutionCode);
+    }
+
+    [Fact]
+    public async Task InvalidateCachedCode_ForcesNewRequest()
+    {
+        // Arrange
+        var handler = new ChatCompletionHandler("print('broken')\n---UNDO---\nprint('undo')", "print('working')");
+        var (service, _) = CreateService(handler);
+        var first = await service.GenerateCodeAsync("Say hi");
+
+        // Act
+        service.InvalidateCachedCode(first.ExecutionCode);
+        var second = await service.GenerateCodeAsync("Say hi");
+
+        // Assert
+        Assert.Equal(2, handler.Calls);
+        Assert.Equal("print('working')", second.ExecutionCode);
+    }
+
+    [Fact]
+    public async Task ReplaceCachedCode_ServesFixedCode_AfterInvalidation()
+    {
+        // Arrange
+        var handler = new ChatCompletionHandler("print('broken')\n---UNDO---\nprint('undo')");
+        var (service, _) = CreateService(handler);
+        var first = await service.GenerateCodeAsync("Say hi");
+
+        // Act
+        service.InvalidateCachedCode(first.ExecutionCode);
+        service.ReplaceCachedCode(first.ExecutionCode, "print('fixed')");
+        var second = await service.GenerateCodeAsync("Say hi");
+
+        // Assert
+        Assert.Equal(1, handler.Calls);
+        Assert.Equal("print('fixed')", second.ExecutionCode);
+        Assert.Equal("print('undo')", second.UndoCode);
+    }
+
+    [Fact]
+    public async Task InvalidateAndReplace_LeaveResponsesSharingAPrefixUntouched()
+    {
+        // Arrange
+        var handler = new ChatCompletionHandler(
+            "print('a')\n---UNDO---\nprint('undo a')",
+            "print('a')\nprint('b')\n---UNDO---\nprint('undo b')");
+        var (service, _) = CreateService(handler);
+        var failed = await service.GenerateCodeAsync("Print a");
+        await service.GenerateCodeAsync("Print a and b");
+
+        // Act
+        service.InvalidateCachedCode(failed.ExecutionCode);
+        service.ReplaceCachedCode(failed.ExecutionCode, "print('fixed')");
+        var fixedResult = await service.GenerateCodeAsync("Print a");
+        var otherResult = await service.GenerateCodeAsync("Print a and b");
+
+        // Assert
+        Assert.Equal(2, handler.Calls);
+        Assert.Equal("print('fixed')", fixedResult.ExecutionCode);
+        Assert.Equal("print('undo a')", fixedResult.UndoCode);
+        Assert.Equal("print('a')\nprint('b')", otherResult.ExecutionCode);
+        Assert.Equal("print('undo b')", otherResult.UndoCode);
+    }
+}
@@ -166,6 +166,23 @@ public class CommandQueueServiceTests
         Assert.Equal("code3", result3?.Code);
     }
 
+    [Fact]
+    public void PeekNextCommand_ReturnsHeadWithoutRemoving()
+    {
+        // Arrange
+        var service = new CommandQueueService();
+        service.AddCommand("first", "code1", "undo1");
+        service.AddCommand("second", "code2", "undo2");
+
+        // Act
+        var peeked = service.PeekNextCommand();
+
+        // Assert
+        Assert.Equal("code1", peeked?.Code);
+        Assert.Equal(2, service.GetQueueCount());
+        Assert.Equal("code1", service.PollNextCommand()?.Code);
+    }
+
     [Fact]
     public void GetHistory_ReturnsAllEntries()
     {
@@ -213,6 +230,43 @@ public class CommandQueueServiceTests
         Assert.Null(result);
     }
 
+    [Fact]
+    public void AddCommand_TrimsOldestEntries_WhenHistoryExceedsMaxLength()
+    {
+        // Arrange
+        var service = new CommandQueueService();
+        service.Preferences.MaxHistoryLength = 2;
+        var first = service.AddCommand("first", "code1", "undo1");
+
+        // Act
+        service.AddCommand("second", "code2", "undo2");
+        var third = service.AddCommand("third", "code3", "undo3");
+
+        // Assert
+        Assert.Equal(2, service.GetHistory().Count);
+        Assert.Null(service.GetCommand(first.Id));
+        Assert.False(service.UndoCommand(first.Id));
+        Assert.Equal("third", service.GetCommand(third.Id)?.UserPrompt);
+    }
+
+    [Fact]
+    public void GetDispatchedCode_TracksLastPayload_UntilReported()
+    {
+        // Arrange
+        var service = new CommandQueueService();
+        var entry = service.AddCommand("prompt", "exec", "undo");
+        service.MarkDispatched(entry.Id, "exec");
+
+        // Act
+        service.MarkDispatched(entry.Id, "undo");
+        var beforeReport = service.GetDispatchedCode(entry.Id);
+        service.ReportExecutionResult(entry.Id, false, "error");
+
+        // Assert
+        Assert.Equal("undo", beforeReport);
+        Assert.Null(service.GetDispatchedCode(entry.Id));
+    }
+
     [Fact]
     public void Preferences_DefaultValues()
     {
@@ -239,6 +293,41 @@ public class CommandQueueServiceTests
         Assert.True(eventFired);
     }
 
+    [Fact]
+    public void HistoryChanged_EventFires_WhenCommandUndone()
+    {
+        // Arrange
+        var service = new CommandQueueService();
+        var entry = service.AddCommand("test", "code", "undo");
+        var eventFired = false;
+        service.HistoryChanged += (sender, args) => eventFired = true;
+
+        // Act
+        service.UndoCommand(entry.Id);
+
+        // Assert
+        Assert.True(eventFired);
+        Assert.Equal(CommandStatus.Undone, service.GetCommand(entry.Id)?.Status);
+    }
+
+    [Fact]
+    public void HistoryVersion_Increments_OnlyWhenHistoryChanges()
+    {
+        // Arrange
+        var service = new CommandQueueService();
+        var entry = service.AddCommand("test", "code", "undo");
+        var versionAfterAdd = service.HistoryVersion;
+
+        // Act
+        service.PollNextCommand();
+        var versionAfterPoll = service.HistoryVersion;
+        service.ReportExecutionResult(entry.Id, true, null);
+
+        // Assert
+        Assert.Equal(versionAfterAdd, versionAfterPoll);
+        Assert.True(service.HistoryVersion > versionAfterPoll);
+    }
+
     [Fact]
     public void AutoIncrementId_WorksCorrectly()
     {
@@ -0,0 +1,112 @@
+using AIChaos.Brain.Services;
+
+namespace AIChaos.Brain.Tests.Services;
+
+public class LruCacheTests
+{
+    [Fact]
+    public void Constructor_ThrowsException_WhenCapacityIsNotPositive()
+    {
+        // Act & Assert
+        Assert.Throws<ArgumentOutOfRangeException>(() => new LruCache<string, string>(0));
+    }
+
+    [Fact]
+    public void TryGet_ReturnsValue_WhenKeyWasSet()
+    {
+        // Arrange
+        var cache = new LruCache<string, string>(2);
+        cache.Set("a", "print('a')");
+
+        // Act
+        var found = cache.TryGet("a", out var value);
+
+        // Assert
+        Assert.True(found);
+        Assert.Equal("print('a')", value);
+    }
+
+    [Fact]
+    public void TryGet_ReturnsFalse_WhenKeyMissing()
+    {
+        // Arrange
+        var cache = new LruCache<string, string>(2);
+
+        // Act
+        var found = cache.TryGet("missing", out _);
+
+        // Assert
+        Assert.False(found);
+    }
+
+    [Fact]
+    public void Set_EvictsLeastRecentlyUsed_WhenFull()
+    {
+        // Arrange
+        var cache = new LruCache<string, string>(2);
+        cache.Set("a", "1");
+        cache.Set("b", "2");
+        cache.TryGet("a", out _);
+
+        // Act
+        cache.Set("c", "3");
+
+        // Assert
+        Assert.Equal(2, cache.Count);
+        Assert.True(cache.TryGet("a", out _));
+        Assert.False(cache.TryGet("b", out _));
+        Assert.True(cache.TryGet("c", out _));
+    }
+
+    [Fact]
+    public void Set_ReplacesValue_WhenKeyExists()
+    {
+        // Arrange
+        var cache = new LruCache<string, string>(2);
+        cache.Set("a", "1");
+
+        // Act
+        cache.Set("a", "2");
+
+        // Assert
+        Assert.Equal(1, cache.Count);
+        Assert.True(cache.TryGet("a", out var value));
+        Assert.Equal("2", value);
+    }
+
+    [Fact]
+    public void RemoveWhere_RemovesMatchingValues()
+    {
+        // Arrange
+        var cache = new LruCache<string, string>(4);
+        cache.Set("a", "bad code");
+        cache.Set("b", "good code");
+        cache.Set("c", "bad code again");
+
+        // Act
+        var removed = cache.RemoveWhere(v => v.StartsWith("bad"));
+
+        // Assert
+        Assert.Equal(2, removed);
+        Assert.Equal(1, cache.Count);
+        Assert.True(cache.TryGet("b", out _));
+    }
+
+    [Fact]
+    public void TakeWhere_ReturnsRemovedEntries()
+    {
+        // Arrange
+        var cache = new LruCache<string, string>(4);
+        cache.Set("a", "bad code");
+        cache.Set("b", "good code");
+
+        // Act
+        var removed = cache.TakeWhere(v => v.StartsWith("bad"));
+
+        // Assert
+        var entry = Assert.Single(removed);
+        Assert.Equal("a", entry.Key);
+        Assert.Equal("bad code", entry.Value);
+        Assert.False(cache.TryGet("a", out _));
+    }
+}
@@ -0,0 +1,70 @@
+using System.Net;
+using AIChaos.Brain.Services;
+
+namespace AIChaos.Brain.Tests.Services;
+
+public class TransientRetryHandlerTests
+{
+    private sealed class SequenceHandler(params HttpStatusCode[] statuses) : HttpMessageHandler
+    {
+        public int Calls { get; private set; }
+
+        protected override Task<HttpResponseMessage> SendAsync(HttpRequestMessage request, CancellationToken cancellationToken)
+        {
+            var status = statuses[Math.Min(Calls, statuses.Length - 1)];
+            Calls++;
+            return Task.FromResult(new HttpResponseMessage(status));
+        }
+    }
+
+    private static HttpClient CreateClient(SequenceHandler inner, int maxRetries = 3)
+    {
+        var handler = new TransientRetryHandler(maxRetries, TimeSpan.Zero) { InnerHandler = inner };
+        return new HttpClient(handler);
+    }
+
+    [Fact]
+    public async Task SendAsync_RetriesTransientStatus_UntilSuccess()
+    {
+        // Arrange
+        var inner = new SequenceHandler(HttpStatusCode.ServiceUnavailable, HttpStatusCode.TooManyRequests, HttpStatusCode.OK);
+        using var client = CreateClient(inner);
+
+        // Act
+        var response = await client.PostAsync("http://localhost/", new StringContent("{}"));
+
+        // Assert
+        Assert.Equal(HttpStatusCode.OK, response.StatusCode);
+        Assert.Equal(3, inner.Calls);
+    }
+
+    [Fact]
+    public async Task SendAsync_DoesNotRetryNonTransientStatus()
+    {
+        // Arrange
+        var inner = new SequenceHandler(HttpStatusCode.BadRequest);
+        using var client = CreateClient(inner);
+
+        // Act
+        var response = await client.GetAsync("http://localhost/");
+
+        // Assert
+        Assert.Equal(HttpStatusCode.BadRequest, response.StatusCode);
+        Assert.Equal(1, inner.Calls);
+    }
+
+    [Fact]
+    public async Task SendAsync_ReturnsLastResponse_WhenRetriesExhausted()
+    {
+        // Arrange
+        var inner = new SequenceHandler(HttpStatusCode.BadGateway);
+        using var client = CreateClient(inner, maxRetries: 2);
+
+        // Act
+        var response = await client.GetAsync("http://localhost/");
+
+        // Assert
+        Assert.Equal(HttpStatusCode.BadGateway, response.StatusCode);
+        Assert.Equal(3, inner.Calls);
+    }
+}
@@ -0,0 +1,40 @@
+namespace AIChaos.Brain.Components.Shared;
+
+/// <summary>
+/// Coalesces bursts of change notifications into at most one refresh per interval.
+/// The first change runs right away; changes inside the interval are folded into one trailing run.
+/// Call <see cref="RunAsync"/> from the component's dispatcher (inside InvokeAsync).
+/// </summary>
+public class RenderThrottle
+{
+    private readonly TimeSpan _interval;
+    private DateTime _lastRun = DateTime.MinValue;
+    private bool _pending;
+
+    public RenderThrottle(TimeSpan interval)
+    {
+        _interval = interval;
+    }
+
+    public async Task RunAsync(Func<Task> refresh)
+    {
+        if (_pending) return;
+
+        try
+        {
+            var wait = _lastRun + _interval - DateTime.UtcNow;
+            if (wait > TimeSpan.Zero)
+            {
+                _pending = true;
+                await Task.Delay(wait);
+            }
+
+            _lastRun = DateTime.UtcNow;
+            await refresh();
+        }
+        finally
+        {
+            _pending = false;
+        }
+    }
+}
@@ -65,6 +65,7 @@ public class ChaosController : ControllerBase
             if (approvedResult.HasValue)
             {
                 _logger.LogInformation("[MAIN CLIENT] Sending approved command #{CommandId}", approvedResult.Value.CommandId);
+                _commandQueue.MarkDispatched(approvedResult.Value.CommandId, approvedResult.Value.Code);
                 return new PollResponse
                 {
                     HasCode = true,
@@ -90,6 +91,7 @@ public class ChaosController : ControllerBase
 
         if (result.HasValue)
         {
+            _commandQueue.MarkDispatched(result.Value.CommandId, result.Value.Code);
             return new PollResponse
             {
                 HasCode = true,
@@ -145,6 +147,9 @@ public class ChaosController : ControllerBase
             request.Error,
             request.ResultData);
 
+        // Read before reporting, which clears it: the same id is reused for undo and repeat payloads
+        var dispatchedCode = _commandQueue.GetDispatchedCode(request.CommandId);
+
         if (_commandQueue.ReportExecutionResult(request.CommandId, request.Success, request.Error))
         {
             if (request.Success)
@@ -154,6 +159,14 @@ public class ChaosController : ControllerBase
             else
             {
                 _logger.LogWarning("[ERROR] Command #{CommandId} failed: {Error}", request.CommandId, request.Error);
+
+                // Don't keep serving cached code that just failed in-game. Only execution code is cached
+                // (possibly a test-client fix of the original), so a failed undo says nothing about it.
+                var failedCommand = _commandQueue.GetCommand(request.CommandId);
+                if (failedCommand != null && dispatchedCode != null && dispatchedCode != failedCommand.UndoCode)
+                {
+                    _codeGenerator.InvalidateCachedCode(dispatchedCode);
+                }
             }
 
             return Ok(new ApiResponse
@@ -145,6 +145,7 @@ public class ModerationController : ControllerBase
                     command.Status = CommandStatus.Queued;
                     command.AiResponse = "?? Image approved - starting interactive session...";
                     command.ImageContext = entry.ImageUrl;
+                    _commandQueue.NotifyHistoryChanged();
                     
                     // We can't directly start an interactive session from here because we need the full
                     // AccountService flow. Instead, we'll mark it for processing and let the client
@@ -179,6 +180,7 @@ public class ModerationController : ControllerBase
                 command.ImageContext = entry.ImageUrl;
                 command.AiResponse = null; // Clear the "waiting for moderation" message
                 command.Status = CommandStatus.Queued;
+                _commandQueue.NotifyHistoryChanged();
                 
                 // Check if test client mode is enabled
                 var isTestClientModeEnabled = _settingsService.Settings.TestClient.Enabled;
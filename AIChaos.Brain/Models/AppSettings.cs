@@ -58,6 +58,30 @@ public class SafetySettings
     public List<string> AllowedDomains { get; set; } = new() { "i.imgur.com", "imgur.com" };
     public List<string> Moderators { get; set; } = new();
     public bool PrivateDiscordMode { get; set; } = false;
+
+    /// <summary>
+    /// Checks whether a host is an allowed domain or a subdomain of one.
+    /// Substring matches don't count, so "evilimgur.com" is not allowed by "imgur.com".
+    /// </summary>
+    public bool IsDomainAllowed(string host)
+    {
+        foreach (var domain in AllowedDomains)
+        {
+            if (host.Equals(domain, StringComparison.OrdinalIgnoreCase))
+            {
+                return true;
+            }
+
+            if (host.Length > domain.Length &&
+                host.EndsWith(domain, StringComparison.OrdinalIgnoreCase) &&
+                host[host.Length - domain.Length - 1] == '.')
+            {
+                return true;
+            }
+        }
+
+        return false;
+    }
 }
 
 public class GeneralSettings
@@ -9,4 +9,9 @@ public static class Constants
     /// The cost in credits/USD for submitting an Idea.
     /// </summary>
     public const decimal CommandCost = 1.00m;
+
+    /// <summary>
+    /// Name of the pooled HttpClient used for OpenRouter API calls.
+    /// </summary>
+    public const string OpenRouterHttpClient = "OpenRouter";
 }
@@ -3,6 +3,7 @@ using AIChaos.Brain.Services;
 using AIChaos.Brain.Components;
 using Microsoft.AspNetCore.Components;
 using Microsoft.AspNetCore.HttpOverrides;
+using System.Net;
 
 var builder = WebApplication.CreateBuilder(args);
 
@@ -31,6 +32,25 @@ builder.Services.AddTransient(sp =>
     return httpClient;
 });
 
+// Dedicated client for OpenRouter: keep-alive connection pooling and HTTP/2 when the server offers it,
+// so back-to-back generations reuse a warm connection instead of paying a new TCP/TLS handshake.
+// Transient failures (rate limits, gateway errors, dropped connections) are retried with backoff.
+builder.Services.AddHttpClient(Constants.OpenRouterHttpClient, client =>
+{
+    client.DefaultRequestVersion = HttpVersion.Version20;
+    client.DefaultVersionPolicy = HttpVersionPolicy.RequestVersionOrLower;
+})
+.AddHttpMessageHandler(() => new TransientRetryHandler())
+.ConfigurePrimaryHttpMessageHandler(() => new SocketsHttpHandler
+{
+    ConnectTimeout = TimeSpan.FromSeconds(5),
+    PooledConnectionLifetime = TimeSpan.FromMinutes(5),
+    PooledConnectionIdleTimeout = TimeSpan.FromMinutes(2),
+    KeepAlivePingDelay = TimeSpan.FromSeconds(30),
+    KeepAlivePingTimeout = TimeSpan.FromSeconds(10),
+    EnableMultipleHttp2Connections = true
+});
+
 // Add Blazor Server services
 builder.Services.AddRazorComponents()
     .AddInteractiveServerComponents();
@@ -103,9 +123,11 @@ if (app.Environment.IsDevelopment())
 }
 
 app.UseCors();
-app.UseStaticFiles();
 app.UseAntiforgery();
 
+// Serve wwwroot via build-time compressed (gzip/brotli), fingerprinted assets with ETags
+app.MapStaticAssets();
+
 // Map Blazor components
 app.MapRazorComponents<App>()
     .AddInteractiveServerRenderMode();
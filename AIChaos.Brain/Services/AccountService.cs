@@ -25,6 +25,9 @@ public class AccountService
     private const int VERIFICATION_CODE_EXPIRY_MINUTES = 30;
     private const int SESSION_EXPIRY_DAYS = 30;
     
+    // Reused across saves; JsonSerializerOptions caches type metadata per instance
+    private static readonly JsonSerializerOptions IndentedJsonOptions = new() { WriteIndented = true };
+    
     /// <summary>
     /// The ID used for the anonymous user in single-user mode.
     /// </summary>
@@ -1331,10 +1334,7 @@ public class AccountService
         {
             try
             {
-                var json = JsonSerializer.Serialize(_accounts.Values.ToList(), new JsonSerializerOptions
-                {
-                    WriteIndented = true
-                });
+                var json = JsonSerializer.Serialize(_accounts.Values.ToList(), IndentedJsonOptions);
                 File.WriteAllText(_accountsPath, json);
             }
             catch (Exception ex)
@@ -1375,10 +1375,7 @@ public class AccountService
         {
             try
             {
-                var json = JsonSerializer.Serialize(_pendingCredits.Values.ToList(), new JsonSerializerOptions
-                {
-                    WriteIndented = true
-                });
+                var json = JsonSerializer.Serialize(_pendingCredits.Values.ToList(), IndentedJsonOptions);
                 File.WriteAllText(_pendingCreditsPath, json);
             }
             catch (Exception ex)
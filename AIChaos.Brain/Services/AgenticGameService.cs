@@ -27,13 +27,19 @@ public class AgenticGameService
     private int _nextSessionId = 1;
     
     // Test client queues (when using test client mode)
-    private readonly List<TestQueueItem> _testQueue = new();
-    private readonly List<(int CommandId, string Code)> _approvedQueue = new();
+    private readonly LinkedList<TestQueueItem> _testQueue = new(); // Fixed code retries jump to the front
+    private readonly Queue<(int CommandId, string Code)> _approvedQueue = new();
     private readonly Dictionary<int, PendingExecution> _pendingExecutions = new();
     
     private const int MaxIterations = 5;
     private const int MaxFixAttempts = 3;
     
+    private static readonly JsonSerializerOptions AgentResponseJsonOptions = new()
+    {
+        PropertyNameCaseInsensitive = true,
+        AllowTrailingCommas = true
+    };
+    
     #region System Prompts
     
     // Use the shared ground rules from AiCodeGeneratorService
@@ -243,12 +249,12 @@ public class AgenticGameService
         {
             if (!IsTestClientEnabled)
             {
-                _approvedQueue.Add((commandId, code));
+                _approvedQueue.Enqueue((commandId, code));
                 return;
             }
             
             var settings = _settingsService.Settings.TestClient;
-            _testQueue.Add(new TestQueueItem
+            _testQueue.AddLast(new TestQueueItem
             {
                 CommandId = commandId,
                 OriginalPrompt = originalPrompt,
@@ -274,8 +280,8 @@ public class AgenticGameService
                 return null;
             }
             
-            var item = _testQueue[0];
-            _testQueue.RemoveAt(0);
+            var item = _testQueue.First!.Value;
+            _testQueue.RemoveFirst();
             
             _pendingExecutions[item.CommandId] = new PendingExecution
             {
@@ -312,8 +318,7 @@ public class AgenticGameService
         lock (_lock)
         {
             if (_approvedQueue.Count == 0) return null;
-            var result = _approvedQueue[0];
-            _approvedQueue.RemoveAt(0);
+            var result = _approvedQueue.Dequeue();
             return result;
         }
     }
@@ -339,7 +344,7 @@ public class AgenticGameService
         {
             lock (_lock)
             {
-                _approvedQueue.Add((commandId, pending.CurrentCode));
+                _approvedQueue.Enqueue((commandId, pending.CurrentCode));
             }
             _logger.LogInformation("[AGENT] Command #{CommandId} PASSED testing - queued for main client", commandId);
             return TestResultAction.Approved;
@@ -358,7 +363,7 @@ public class AgenticGameService
                     {
                         lock (_lock)
                         {
-                            _testQueue.Insert(0, new TestQueueItem
+                            _testQueue.AddFirst(new TestQueueItem
                             {
                                 CommandId = commandId,
                                 OriginalPrompt = pending.OriginalPrompt,
@@ -647,7 +652,7 @@ public class AgenticGameService
             }
         };
         
-        var httpClient = _httpClientFactory.CreateClient();
+        var httpClient = _httpClientFactory.CreateClient(Constants.OpenRouterHttpClient);
         var request = new HttpRequestMessage(HttpMethod.Post, $"{settings.OpenRouter.BaseUrl}/chat/completions")
         {
             Content = new StringContent(JsonSerializer.Serialize(requestBody), Encoding.UTF8, "application/json")
@@ -696,7 +701,7 @@ public class AgenticGameService
             }
         };
         
-        var httpClient = _httpClientFactory.CreateClient();
+        var httpClient = _httpClientFactory.CreateClient(Constants.OpenRouterHttpClient);
         var request = new HttpRequestMessage(HttpMethod.Post, $"{settings.OpenRouter.BaseUrl}/chat/completions")
         {
             Content = new StringContent(JsonSerializer.Serialize(requestBody), Encoding.UTF8, "application/json")
@@ -793,11 +798,7 @@ public class AgenticGameService
                 };
             }
             
-            var response = JsonSerializer.Deserialize<AgentAiResponse>(jsonContent, new JsonSerializerOptions 
-            { 
-                PropertyNameCaseInsensitive = true,
-                AllowTrailingCommas = true
-            });
+            var response = JsonSerializer.Deserialize<AgentAiResponse>(jsonContent, AgentResponseJsonOptions);
             
             if (response == null)
             {
@@ -1,5 +1,7 @@
+using System.Buffers;
 using System.Text;
 using System.Text.Json;
+using System.Text.RegularExpressions;
 using AIChaos.Brain.Models;
 
 namespace AIChaos.Brain.Services;
@@ -14,6 +16,79 @@ public class AiCodeGeneratorService
     private readonly CommandQueueService _commandQueue;
     private readonly ILogger<AiCodeGeneratorService> _logger;
     
+    // Cache of raw AI responses keyed by model, prompt mode, map, normalized request and image context.
+    // Only used when no command history is sent with the request (history disabled or empty);
+    // repeat requests then skip the OpenRouter round-trip. Safety checks still run on every hit.
+    private const int ResponseCacheCapacity = 512;
+    private const string UndoSeparator = "---UNDO---";
+    private readonly LruCache<string, string> _responseCache = new(ResponseCacheCapacity);
+    
+    // Responses evicted after a failure, keyed by the failed execution code, waiting for a fix from the test client
+    private const int FailedResponseCapacity = 64;
+    private readonly LruCache<string, List<KeyValuePair<string, string>>> _failedResponses = new(FailedResponseCapacity);
+    
+    // Every dangerous pattern contains at least one of these literals. Code with none of them
+    // (the common case) skips the regex table after a single vectorized scan.
+    private static readonly SearchValues<string> DangerousLiterals = SearchValues.Create(
+        ["changelevel", "ConsoleCommand", "ConCommand", "Kick", "Kill", "SetHealth", "TakeDamage"],
+        StringComparison.OrdinalIgnoreCase);
+    
+    // Same idea for the moderation (URL) patterns: each one needs "http" or "OpenURL" to match
+    private static readonly SearchValues<string> FilteredLiterals = SearchValues.Create(
+        ["http", "OpenURL"],
+        StringComparison.OrdinalIgnoreCase);
+    
+    // Patterns that are always blocked, compiled once instead of re-parsed on every check
+    private static readonly (Regex Pattern, string Reason)[] DangerousChecks =
+    [
+        (SafetyPattern(@"changelevel"), "Map change command (changelevel)"),
+        (SafetyPattern(@"RunConsoleCommand.*[""']map[""']"), "Map change via console (map)"),
+        (SafetyPattern(@"game\.ConsoleCommand.*[""']map\s"), "Map change via console (map)"),
+        (SafetyPattern(@"game\.ConsoleCommand.*[""']changelevel"), "Map change via console (changelevel)"),
+        (SafetyPattern(@"RunConsoleCommand.*[""']changelevel"), "Map change via console (changelevel)"),
+        (SafetyPattern(@"RunConsoleCommand.*[""']disconnect[""']"), "Disconnect command"),
+        (SafetyPattern(@"game\.ConsoleCommand.*[""']disconnect"), "Disconnect command"),
+        (SafetyPattern(@":\s*Kick\s*\("), "Player kick"),
+        (SafetyPattern(@"player\.Kick"), "Player kick"),
+        (SafetyPattern(@"RunConsoleCommand.*[""']kill[""']"), "Kill command (RunConsoleCommand)"),
+        (SafetyPattern(@"game\.ConsoleCommand.*[""']kill"), "Kill command (game.ConsoleCommand)"),
+        (SafetyPattern(@"ConCommand\s*\(\s*[""']kill[""']"), "Kill command (ConCommand)"),
+        (SafetyPattern(@"RunConsoleCommand.*[""']suicide[""']"), "Suicide command (RunConsoleCommand)"),
+        (SafetyPattern(@"game\.ConsoleCommand.*[""']suicide"), "Suicide command (game.ConsoleCommand)"),
+        (SafetyPattern(@"ConCommand\s*\(\s*[""']suicide[""']"), "Suicide command (ConCommand)"),
+        (SafetyPattern(@"RunConsoleCommand.*[""']screenshot[""']"), "Screenshot command (via screenshot concmd)"),
+        (SafetyPattern(@"RunConsoleCommand.*[""']jpeg[""']"), "Screenshot command (via jpeg concmd)"),
+        (SafetyPattern(@"RunConsoleCommand.*[""']unbindall[""']"), "unbindall"),
+        (SafetyPattern(@"game\.ConsoleCommand.*unbindall"), "unbindall"),
+        (SafetyPattern(@"game\.ConsoleCommand.*suicide"), "Suicide command"),
+        (SafetyPattern(@"SetHealth\s*\(\s*0\s*\)"), "Instant death (SetHealth to 0)"),
+        (SafetyPattern(@"SetHealth\s*\(\s*-"), "Instant death (negative health)"),
+        (SafetyPattern(@":Kill\s*\(\s*\)"), "Instant death (Kill method)"),
+        (SafetyPattern(@"TakeDamage\s*\(\s*9999"), "Extreme damage"),
+        (SafetyPattern(@"TakeDamage\s*\(\s*999999"), "Extreme damage")
+    ];
+    
+    // Patterns that send code to moderation, checked in order (most specific first)
+    private static readonly (Regex Pattern, string Reason)[] FilteredChecks =
+    [
+        // Check for specific URL opening functions first (more specific)
+        (SafetyPattern(@"http\.Fetch\s*\("), "External HTTP request (http.Fetch)"),
+        (SafetyPattern(@"HTTP\.Fetch\s*\("), "External HTTP request (HTTP.Fetch)"),
+        (SafetyPattern(@"html:?OpenURL\s*\("), "External URL opening (html:OpenURL)"),
+        (SafetyPattern(@"gui\.OpenURL\s*\("), "External URL opening (gui.OpenURL)"),
+        (SafetyPattern(@"steamworks\.OpenURL\s*\("), "External URL opening (steamworks.OpenURL)"),
+
+        // Check for iframes with external sources
+        (SafetyPattern(@"<iframe[^>]*src\s*=\s*[""']https?://"), "External iframe detected"),
+        (SafetyPattern(@"iframe.*src.*http"), "External iframe detected"),
+
+        // Generic URL pattern (catches any http:// or https://)
+        (SafetyPattern(@"https?://"), "URL detected in code")
+    ];
+    
+    private static Regex SafetyPattern(string pattern) =>
+        new(pattern, RegexOptions.IgnoreCase | RegexOptions.Compiled);
+    
     /// <summary>
     /// Shared ground rules for GLua code generation that can be used by other services.
     /// These rules define the server/client architecture, safety rules, and best practices.
@@ -185,13 +260,33 @@ public class AiCodeGeneratorService
         RunConsoleCommand("sv_gravity", "600")
         """;
 
+    // The system messages never change, so they are serialized once and embedded as-is in every
+    // request body. The large prompts are also marked as a cacheable prefix: providers that support
+    // prompt caching (e.g. Anthropic) bill and prefill only the user message on a hit.
+    private static readonly JsonElement StandardSystemMessage = CreateCachedSystemMessage(SystemPrompt);
+    private static readonly JsonElement PrivateDiscordModeSystemMessage = CreateCachedSystemMessage(PrivateDiscordModePrompt);
+    private static readonly JsonElement ForceUndoSystemMessage = JsonSerializer.SerializeToElement(new
+    {
+        role = "system",
+        content = "You are a Garry's Mod Lua expert. Generate code to completely stop and reverse problematic effects."
+    });
+
+    private static JsonElement CreateCachedSystemMessage(string prompt) => JsonSerializer.SerializeToElement(new
+    {
+        role = "system",
+        content = new[]
+        {
+            new { type = "text", text = prompt, cache_control = new { type = "ephemeral" } }
+        }
+    });
+
     public AiCodeGeneratorService(
-        HttpClient httpClient,
+        IHttpClientFactory httpClientFactory,
         SettingsService settingsService,
         CommandQueueService commandQueue,
         ILogger<AiCodeGeneratorService> logger)
     {
-        _httpClient = httpClient;
+        _httpClient = httpClientFactory.CreateClient(Constants.OpenRouterHttpClient);
         _settingsService = settingsService;
         _commandQueue = commandQueue;
         _logger = logger;
@@ -216,66 +311,59 @@ public class AiCodeGeneratorService
         }
 
         // Include recent command history if enabled
+        var historyContext = new StringBuilder();
         if (includeHistory && _commandQueue.Preferences.IncludeHistoryInAi)
         {
             var recentCommands = _commandQueue.GetRecentCommands();
             if (recentCommands.Any())
             {
-                userContent.Append("\n\n[RECENT COMMAND HISTORY]:\n");
+                historyContext.Append("\n\n[RECENT COMMAND HISTORY]:\n");
                 foreach (var cmd in recentCommands)
                 {
-                    userContent.Append($"- {cmd.Timestamp:HH:mm:ss}: {cmd.UserPrompt}\n");
+                    historyContext.Append($"- {cmd.Timestamp:HH:mm:ss}: {cmd.UserPrompt}\n");
                 }
             }
         }
+        userContent.Append(historyContext);
 
         try
         {
             var settings = _settingsService.Settings;
-            // Use unfiltered prompt when Private Discord Mode is enabled
-            var activePrompt = settings.Safety.PrivateDiscordMode ? PrivateDiscordModePrompt : SystemPrompt;
-
-            var requestBody = new
+            var cacheKey = BuildResponseCacheKey(settings, currentMap, userRequest, imageContext);
+
+            // The history block carries timestamps and changes after every command, so a response
+            // generated with it can never be reused. Only history-free requests use the cache.
+            var useCache = historyContext.Length == 0;
+            string? code = null;
+            var isCached = useCache && _responseCache.TryGet(cacheKey, out code);
+            if (isCached)
             {
-                model = settings.OpenRouter.Model,
-                messages = new[]
-                {
-                    new { role = "system", content = activePrompt },
-                    new { role = "user", content = userContent.ToString() }
-                }
-            };
-
-            var request = new HttpRequestMessage(HttpMethod.Post, $"{settings.OpenRouter.BaseUrl}/chat/completions")
+                _logger.LogInformation("Using cached AI response for request: {Request}", userRequest);
+            }
+            else
             {
-                Content = new StringContent(
-                    JsonSerializer.Serialize(requestBody),
-                    Encoding.UTF8,
-                    "application/json")
-            };
-
-            request.Headers.Add("Authorization", $"Bearer {settings.OpenRouter.ApiKey}");
+                // Use unfiltered prompt when Private Discord Mode is enabled
+                var systemMessage = settings.Safety.PrivateDiscordMode ? PrivateDiscordModeSystemMessage : StandardSystemMessage;
 
-            var response = await _httpClient.SendAsync(request);
-            response.EnsureSuccessStatusCode();
-
-            var responseContent = await response.Content.ReadAsStringAsync();
-            var jsonDoc = JsonDocument.Parse(responseContent);
+                var requestBody = new
+                {
+                    model = settings.OpenRouter.Model,
+                    messages = new object[]
+                    {
+                        systemMessage,
+                        new { role = "user", content = userContent.ToString() }
+                    }
+                };
 
-            var code = jsonDoc.RootElement
-                .GetProperty("choices")[0]
-                .GetProperty("message")
-                .GetProperty("content")
-                .GetString() ?? "";
+                code = await SendChatCompletionAsync(settings.OpenRouter, requestBody);
+            }
 
-            // Clean up markdown if present
-            code = code.Replace("```lua", "").Replace("```", "").Trim();
+            code ??= "";
 
             // Parse execution and undo code
-            if (code.Contains("---UNDO---"))
+            if (code.Contains(UndoSeparator))
             {
-                var parts = code.Split("---UNDO---");
-                var executionCode = parts[0].Trim();
-                var undoCode = parts.Length > 1 ? parts[1].Trim() : "print(\"No undo code provided\")";
+                var (executionCode, undoCode) = SplitResponse(code);
                 
                 // Check for dangerous patterns first (always block these)
                 var dangerousReason = GetDangerousPatternReason(executionCode);
@@ -301,6 +389,13 @@ public class AiCodeGeneratorService
                     }
                 }
                 
+                // Only cache responses that passed the safety checks, so a blocked or flagged reply
+                // gets a fresh attempt from the AI next time
+                if (useCache && !isCached)
+                {
+                    _responseCache.Set(cacheKey, code);
+                }
+                
                 return (executionCode, undoCode, false, null);
             }
 
@@ -330,6 +425,11 @@ public class AiCodeGeneratorService
                 }
             }
 
+            if (useCache && !isCached && !string.IsNullOrEmpty(singleCode))
+            {
+                _responseCache.Set(cacheKey, code);
+            }
+
             return (singleCode, "print(\"Undo not available for this command\")", false, null);
         }
         catch (Exception ex)
@@ -339,44 +439,87 @@ public class AiCodeGeneratorService
         }
     }
 
+    /// <summary>
+    /// Drops cached responses whose execution code matches, so the next identical request asks the AI again.
+    /// Called when the game or the test client reports that a command failed.
+    /// </summary>
+    public void InvalidateCachedCode(string executionCode)
+    {
+        if (string.IsNullOrEmpty(executionCode)) return;
+
+        var removed = _responseCache.TakeWhere(code => SplitResponse(code).ExecutionCode == executionCode);
+        if (removed.Count > 0)
+        {
+            // Keep the evicted entries around briefly so a successful fix can be written back under the same keys
+            _failedResponses.Set(executionCode, removed);
+            _logger.LogInformation("Removed {Count} cached AI response(s) after execution failure", removed.Count);
+        }
+    }
+
+    /// <summary>
+    /// Writes fixed execution code back into the cache for responses previously invalidated
+    /// because <paramref name="executionCode"/> failed. The cached undo code is kept.
+    /// </summary>
+    public void ReplaceCachedCode(string executionCode, string fixedExecutionCode)
+    {
+        if (string.IsNullOrEmpty(executionCode) || string.IsNullOrEmpty(fixedExecutionCode)) return;
+        if (!_failedResponses.TryGet(executionCode, out var failed)) return;
+
+        _failedResponses.Remove(executionCode);
+        foreach (var (key, code) in failed)
+        {
+            var fixedCode = code.Contains(UndoSeparator)
+                ? $"{fixedExecutionCode}\n{UndoSeparator}\n{SplitResponse(code).UndoCode}"
+                : fixedExecutionCode;
+            _responseCache.Set(key, fixedCode);
+        }
+
+        _logger.LogInformation("Cached fixed code for {Count} AI response(s)", failed.Count);
+    }
+
+    /// <summary>
+    /// Splits a raw AI response into execution and undo code. Responses without a separator are
+    /// all execution code.
+    /// </summary>
+    private static (string ExecutionCode, string UndoCode) SplitResponse(string code)
+    {
+        if (!code.Contains(UndoSeparator))
+        {
+            return (code, "print(\"Undo not available for this command\")");
+        }
+
+        var parts = code.Split(UndoSeparator);
+        var undoCode = parts.Length > 1 ? parts[1].Trim() : "print(\"No undo code provided\")";
+        return (parts[0].Trim(), undoCode);
+    }
+
+    /// <summary>
+    /// Builds the response cache key. Requests are matched case-insensitively and ignore surrounding whitespace.
+    /// </summary>
+    private static string BuildResponseCacheKey(AppSettings settings, string currentMap, string userRequest, string? imageContext)
+    {
+        return string.Join('\n',
+            settings.OpenRouter.Model,
+            settings.Safety.PrivateDiscordMode ? "private" : "standard",
+            currentMap,
+            userRequest.Trim().ToLowerInvariant(),
+            imageContext ?? "");
+    }
+
     /// <summary>
     /// Checks if code contains dangerous patterns that could break the game.
     /// These are always blocked, never sent to moderation.
     /// </summary>
     private static string? GetDangerousPatternReason(string code)
     {
-        var dangerousChecks = new Dictionary<string, string>
+        if (!code.AsSpan().ContainsAny(DangerousLiterals))
         {
-            [@"changelevel"] = "Map change command (changelevel)",
-            [@"RunConsoleCommand.*[""']map[""']"] = "Map change via console (map)",
-            [@"game\.ConsoleCommand.*[""']map\s"] = "Map change via console (map)",
-            [@"game\.ConsoleCommand.*[""']changelevel"] = "Map change via console (changelevel)",
-            [@"RunConsoleCommand.*[""']changelevel"] = "Map change via console (changelevel)",
-            [@"RunConsoleCommand.*[""']disconnect[""']"] = "Disconnect command",
-            [@"game\.ConsoleCommand.*[""']disconnect"] = "Disconnect command",
-            [@":\s*Kick\s*\("] = "Player kick",
-            [@"player\.Kick"] = "Player kick",
-            [@"RunConsoleCommand.*[""']kill[""']"] = "Kill command (RunConsoleCommand)",
-            [@"game\.ConsoleCommand.*[""']kill"] = "Kill command (game.ConsoleCommand)",
-            [@"ConCommand\s*\(\s*[""']kill[""']"] = "Kill command (ConCommand)",
-            [@"RunConsoleCommand.*[""']suicide[""']"] = "Suicide command (RunConsoleCommand)",
-            [@"game\.ConsoleCommand.*[""']suicide"] = "Suicide command (game.ConsoleCommand)",
-            [@"ConCommand\s*\(\s*[""']suicide[""']"] = "Suicide command (ConCommand)",
-            [@"RunConsoleCommand.*[""']screenshot[""']"] = "Screenshot command (via screenshot concmd)",
-            [@"RunConsoleCommand.*[""']jpeg[""']"] = "Screenshot command (via jpeg concmd)",
-            [@"RunConsoleCommand.*[""']unbindall[""']"] = "unbindall",
-            [@"game\.ConsoleCommand.*unbindall"] = "unbindall",
-            [@"game\.ConsoleCommand.*suicide"] = "Suicide command",
-            [@"SetHealth\s*\(\s*0\s*\)"] = "Instant death (SetHealth to 0)",
-            [@"SetHealth\s*\(\s*-"] = "Instant death (negative health)",
-            [@":Kill\s*\(\s*\)"] = "Instant death (Kill method)",
-            [@"TakeDamage\s*\(\s*9999"] = "Extreme damage",
-            [@"TakeDamage\s*\(\s*999999"] = "Extreme damage"
-        };
+            return null;
+        }
 
-        foreach (var (pattern, reason) in dangerousChecks)
+        foreach (var (pattern, reason) in DangerousChecks)
         {
-            if (System.Text.RegularExpressions.Regex.IsMatch(code, pattern, System.Text.RegularExpressions.RegexOptions.IgnoreCase))
+            if (pattern.IsMatch(code))
             {
                 return reason;
             }
@@ -391,26 +534,14 @@ public class AiCodeGeneratorService
     /// </summary>
     private static string? GetFilteredPatternReason(string code)
     {
-        var filteredChecks = new Dictionary<string, string>
+        if (!code.AsSpan().ContainsAny(FilteredLiterals))
         {
-            // Check for specific URL opening functions first (more specific)
-            [@"http\.Fetch\s*\("] = "External HTTP request (http.Fetch)",
-            [@"HTTP\.Fetch\s*\("] = "External HTTP request (HTTP.Fetch)",
-            [@"html:?OpenURL\s*\("] = "External URL opening (html:OpenURL)",
-            [@"gui\.OpenURL\s*\("] = "External URL opening (gui.OpenURL)",
-            [@"steamworks\.OpenURL\s*\("] = "External URL opening (steamworks.OpenURL)",
-            
-            // Check for iframes with external sources
-            [@"<iframe[^>]*src\s*=\s*[""']https?://"] = "External iframe detected",
-            [@"iframe.*src.*http"] = "External iframe detected",
-            
-            // Generic URL pattern (catches any http:// or https://)
-            [@"https?://"] = "URL detected in code"
-        };
+            return null;
+        }
 
-        foreach (var (pattern, reason) in filteredChecks)
+        foreach (var (pattern, reason) in FilteredChecks)
         {
-            if (System.Text.RegularExpressions.Regex.IsMatch(code, pattern, System.Text.RegularExpressions.RegexOptions.IgnoreCase))
+            if (pattern.IsMatch(code))
             {
                 return reason;
             }
@@ -455,36 +586,14 @@ public class AiCodeGeneratorService
             var requestBody = new
             {
                 model = settings.OpenRouter.Model,
-                messages = new[]
+                messages = new object[]
                 {
-                    new { role = "system", content = "You are a Garry's Mod Lua expert. Generate code to completely stop and reverse problematic effects." },
+                    ForceUndoSystemMessage,
                     new { role = "user", content = forceUndoPrompt }
                 }
             };
 
-            var request = new HttpRequestMessage(HttpMethod.Post, $"{settings.OpenRouter.BaseUrl}/chat/completions")
-            {
-                Content = new StringContent(
-                    JsonSerializer.Serialize(requestBody),
-                    Encoding.UTF8,
-                    "application/json")
-            };
-
-            request.Headers.Add("Authorization", $"Bearer {settings.OpenRouter.ApiKey}");
-
-            var response = await _httpClient.SendAsync(request);
-            response.EnsureSuccessStatusCode();
-
-            var responseContent = await response.Content.ReadAsStringAsync();
-            var jsonDoc = JsonDocument.Parse(responseContent);
-
-            var code = jsonDoc.RootElement
-                .GetProperty("choices")[0]
-                .GetProperty("message")
-                .GetProperty("content")
-                .GetString() ?? "";
-
-            return code.Replace("```lua", "").Replace("```", "").Trim();
+            return await SendChatCompletionAsync(settings.OpenRouter, requestBody);
         }
         catch (Exception ex)
         {
@@ -493,6 +602,38 @@ public class AiCodeGeneratorService
         }
     }
 
+    /// <summary>
+    /// Sends a chat completion request to OpenRouter and returns the first choice's content
+    /// with any markdown code fences removed.
+    /// </summary>
+    private async Task<string> SendChatCompletionAsync(OpenRouterSettings openRouter, object requestBody)
+    {
+        using var request = new HttpRequestMessage(HttpMethod.Post, $"{openRouter.BaseUrl}/chat/completions")
+        {
+            Content = new StringContent(
+                JsonSerializer.Serialize(requestBody),
+                Encoding.UTF8,
+                "application/json")
+        };
+
+        request.Headers.Add("Authorization", $"Bearer {openRouter.ApiKey}");
+
+        // Parse straight off the response stream instead of buffering the body into a string first
+        using var response = await _httpClient.SendAsync(request, HttpCompletionOption.ResponseHeadersRead);
+        response.EnsureSuccessStatusCode();
+
+        await using var responseStream = await response.Content.ReadAsStreamAsync();
+        using var jsonDoc = await JsonDocument.ParseAsync(responseStream);
+
+        var content = jsonDoc.RootElement
+            .GetProperty("choices")[0]
+            .GetProperty("message")
+            .GetProperty("content")
+            .GetString() ?? "";
+
+        return content.Replace("```lua", "").Replace("```", "").Trim();
+    }
+
     /// <summary>
     /// Strips URLs and http.Fetch calls from generated code.
     /// Removes both literal URLs and http.Fetch function calls to prevent external resource access.
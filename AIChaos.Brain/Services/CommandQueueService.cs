@@ -8,8 +8,10 @@ namespace AIChaos.Brain.Services;
 /// </summary>
 public class CommandQueueService
 {
-    private readonly List<(int CommandId, string Code)> _queue = new();
+    private readonly Queue<(int CommandId, string Code)> _queue = new();
     private readonly List<CommandEntry> _history = new();
+    private readonly Dictionary<int, CommandEntry> _historyById = new();
+    private readonly Dictionary<int, string> _dispatchedCode = new(); // Last code sent per command, until reported
     private readonly List<SavedPayload> _savedPayloads = new();
     private readonly object _lock = new();
     private int _nextId = 1;
@@ -18,22 +20,39 @@ public class CommandQueueService
     private static readonly string SavedPayloadsDirectory = Path.Combine(
         AppDomain.CurrentDomain.BaseDirectory, "..", "saved_payloads");
     private static readonly string SavedPayloadsFile = Path.Combine(SavedPayloadsDirectory, "payloads.json");
+    private static readonly JsonSerializerOptions IndentedJsonOptions = new() { WriteIndented = true };
     
     public UserPreferences Preferences { get; } = new();
     
     // Event for when history changes
     public event EventHandler? HistoryChanged;
     
+    private long _historyVersion;
+    
     public CommandQueueService()
     {
         LoadSavedPayloads();
     }
     
+    /// <summary>
+    /// Incremented on every history change, so views can skip reloading when nothing changed.
+    /// </summary>
+    public long HistoryVersion => Interlocked.Read(ref _historyVersion);
+    
     private void OnHistoryChanged()
     {
+        Interlocked.Increment(ref _historyVersion);
         HistoryChanged?.Invoke(this, EventArgs.Empty);
     }
     
+    /// <summary>
+    /// Signals that a history entry was modified in place (e.g. by a moderator decision).
+    /// </summary>
+    public void NotifyHistoryChanged()
+    {
+        OnHistoryChanged();
+    }
+    
     /// <summary>
     /// Adds a command to the queue and history.
     /// </summary>
@@ -68,16 +87,10 @@ public class CommandQueueService
             // Add to execution queue with ID (only if requested)
             if (queueForExecution)
             {
-                _queue.Add((entry.Id, executionCode));
+                _queue.Enqueue((entry.Id, executionCode));
             }
             
-            _history.Add(entry);
-            
-            // Trim history if needed
-            while (_history.Count > Preferences.MaxHistoryLength)
-            {
-                _history.RemoveAt(0);
-            }
+            AddToHistory(entry);
             
             OnHistoryChanged(); // Notify that history has changed
             
@@ -111,22 +124,37 @@ public class CommandQueueService
             // Add to execution queue with ID (only if requested)
             if (queueForExecution)
             {
-                _queue.Add((entry.Id, executionCode));
+                _queue.Enqueue((entry.Id, executionCode));
             }
             
-            _history.Add(entry);
-            
-            // Trim history if needed
-            while (_history.Count > Preferences.MaxHistoryLength)
-            {
-                _history.RemoveAt(0);
-            }
+            AddToHistory(entry);
             
             OnHistoryChanged();
             return entry;
         }
     }
     
+    /// <summary>
+    /// Appends an entry to history and drops the oldest entries beyond the configured length.
+    /// Must be called while holding the lock.
+    /// </summary>
+    private void AddToHistory(CommandEntry entry)
+    {
+        _history.Add(entry);
+        _historyById[entry.Id] = entry;
+        
+        var excess = _history.Count - Preferences.MaxHistoryLength;
+        if (excess > 0)
+        {
+            for (var i = 0; i < excess; i++)
+            {
+                _historyById.Remove(_history[i].Id);
+                _dispatchedCode.Remove(_history[i].Id);
+            }
+            _history.RemoveRange(0, excess);
+        }
+    }
+    
     /// <summary>
     /// Polls for the next command in the queue.
     /// Returns both the command ID and code so GMod can report back results.
@@ -135,16 +163,39 @@ public class CommandQueueService
     {
         lock (_lock)
         {
-            if (_queue.Count > 0)
+            if (_queue.TryDequeue(out var item))
             {
-                var item = _queue[0];
-                _queue.RemoveAt(0);
                 return item;
             }
             return null;
         }
     }
     
+    /// <summary>
+    /// Records the code sent to the game for a command, so a reported failure can be matched to
+    /// the payload that caused it (execution, repeat or undo code all share the command ID).
+    /// </summary>
+    public void MarkDispatched(int commandId, string code)
+    {
+        if (commandId <= 0) return;
+        
+        lock (_lock)
+        {
+            _dispatchedCode[commandId] = code;
+        }
+    }
+    
+    /// <summary>
+    /// Gets the code most recently sent to the game for a command that hasn't reported back yet.
+    /// </summary>
+    public string? GetDispatchedCode(int commandId)
+    {
+        lock (_lock)
+        {
+            return _dispatchedCode.GetValueOrDefault(commandId);
+        }
+    }
+    
     /// <summary>
     /// Peeks at the next command without removing it from the queue.
     /// </summary>
@@ -152,9 +203,9 @@ public class CommandQueueService
     {
         lock (_lock)
         {
-            if (_queue.Count > 0)
+            if (_queue.TryPeek(out var item))
             {
-                return _queue[0];
+                return item;
             }
             return null;
         }
@@ -200,7 +251,7 @@ public class CommandQueueService
     {
         lock (_lock)
         {
-            return _history.FirstOrDefault(c => c.Id == id);
+            return _historyById.GetValueOrDefault(id);
         }
     }
     
@@ -211,10 +262,10 @@ public class CommandQueueService
     {
         lock (_lock)
         {
-            var command = _history.FirstOrDefault(c => c.Id == commandId);
+            var command = _historyById.GetValueOrDefault(commandId);
             if (command == null) return false;
             
-            _queue.Add((commandId, command.ExecutionCode));
+            _queue.Enqueue((commandId, command.ExecutionCode));
             return true;
         }
     }
@@ -226,11 +277,12 @@ public class CommandQueueService
     {
         lock (_lock)
         {
-            var command = _history.FirstOrDefault(c => c.Id == commandId);
+            var command = _historyById.GetValueOrDefault(commandId);
             if (command == null) return false;
             
-            _queue.Add((commandId, command.UndoCode));
+            _queue.Enqueue((commandId, command.UndoCode));
             command.Status = CommandStatus.Undone;
+            OnHistoryChanged();
             return true;
         }
     }
@@ -243,7 +295,7 @@ public class CommandQueueService
         lock (_lock)
         {
             // Use -1 as command ID for ad-hoc code (force undo, etc.)
-            _queue.Add((-1, code));
+            _queue.Enqueue((-1, code));
         }
     }
     
@@ -254,7 +306,7 @@ public class CommandQueueService
     {
         lock (_lock)
         {
-            _queue.Add((commandId, code));
+            _queue.Enqueue((commandId, code));
         }
     }
     
@@ -265,7 +317,7 @@ public class CommandQueueService
     {
         lock (_lock)
         {
-            _queue.Add((command.Id, command.ExecutionCode));
+            _queue.Enqueue((command.Id, command.ExecutionCode));
             OnHistoryChanged();
         }
     }
@@ -277,7 +329,9 @@ public class CommandQueueService
     {
         lock (_lock)
         {
-            var command = _history.FirstOrDefault(c => c.Id == commandId);
+            _dispatchedCode.Remove(commandId);
+            
+            var command = _historyById.GetValueOrDefault(commandId);
             if (command == null) return false;
             
             command.ExecutedAt = DateTime.UtcNow;
@@ -304,6 +358,9 @@ public class CommandQueueService
         lock (_lock)
         {
             _history.Clear();
+            _historyById.Clear();
+            _dispatchedCode.Clear();
+            OnHistoryChanged();
         }
     }
     
@@ -406,10 +463,7 @@ public class CommandQueueService
             // Ensure directory exists
             Directory.CreateDirectory(SavedPayloadsDirectory);
             
-            var json = JsonSerializer.Serialize(_savedPayloads, new JsonSerializerOptions
-            {
-                WriteIndented = true
-            });
+            var json = JsonSerializer.Serialize(_savedPayloads, IndentedJsonOptions);
             File.WriteAllText(SavedPayloadsFile, json);
         }
         catch
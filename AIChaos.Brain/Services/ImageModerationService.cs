@@ -36,20 +36,24 @@ public class ImageModerationService
     }
     
     /// <summary>
-    /// Extracts ALL URLs from a prompt.
+    /// Extracts ALL URLs from a prompt, without duplicates, in the order they appear.
     /// </summary>
     public List<string> ExtractImageUrls(string prompt)
     {
-        var urls = new HashSet<string>();
+        var urls = new List<string>();
+        var seen = new HashSet<string>();
         
         // Find all URLs
         foreach (Match match in UrlPattern.Matches(prompt))
         {
             var url = match.Value.TrimEnd(')', ']', '>', ',', '.', '!', '?', ';', ':');
-            urls.Add(url);
+            if (seen.Add(url))
+            {
+                urls.Add(url);
+            }
         }
         
-        return urls.ToList();
+        return urls;
     }
     
     /// <summary>
@@ -57,8 +61,7 @@ public class ImageModerationService
     /// </summary>
     public bool NeedsModeration(string prompt)
     {
-        var urls = ExtractImageUrls(prompt);
-        return urls.Count > 0;
+        return UrlPattern.IsMatch(prompt);
     }
     
     /// <summary>
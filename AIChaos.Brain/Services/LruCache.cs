@@ -0,0 +1,129 @@
+namespace AIChaos.Brain.Services;
+
+/// <summary>
+/// Small thread-safe least-recently-used cache with a fixed capacity.
+/// </summary>
+public class LruCache<TKey, TValue> where TKey : notnull
+{
+    private readonly Dictionary<TKey, LinkedListNode<(TKey Key, TValue Value)>> _entries;
+    private readonly LinkedList<(TKey Key, TValue Value)> _order = new();
+    private readonly object _lock = new();
+
+    public LruCache(int capacity)
+    {
+        if (capacity <= 0)
+        {
+            throw new ArgumentOutOfRangeException(nameof(capacity), "Capacity must be positive");
+        }
+
+        Capacity = capacity;
+        _entries = new Dictionary<TKey, LinkedListNode<(TKey Key, TValue Value)>>(capacity);
+    }
+
+    /// <summary>
+    /// Maximum number of entries kept before the least recently used one is evicted.
+    /// </summary>
+    public int Capacity { get; }
+
+    /// <summary>
+    /// Gets the current number of cached entries.
+    /// </summary>
+    public int Count
+    {
+        get
+        {
+            lock (_lock)
+            {
+                return _entries.Count;
+            }
+        }
+    }
+
+    /// <summary>
+    /// Looks up a value and marks it as most recently used.
+    /// </summary>
+    public bool TryGet(TKey key, out TValue value)
+    {
+        lock (_lock)
+        {
+            if (_entries.TryGetValue(key, out var node))
+            {
+                _order.Remove(node);
+                _order.AddFirst(node);
+                value = node.Value.Value;
+                return true;
+            }
+
+            value = default!;
+            return false;
+        }
+    }
+
+    /// <summary>
+    /// Adds or replaces a value, evicting the least recently used entry when full.
+    /// </summary>
+    public void Set(TKey key, TValue value)
+    {
+        lock (_lock)
+        {
+            if (_entries.TryGetValue(key, out var existing))
+            {
+                _order.Remove(existing);
+            }
+            else if (_entries.Count >= Capacity)
+            {
+                var oldest = _order.Last!;
+                _order.RemoveLast();
+                _entries.Remove(oldest.Value.Key);
+            }
+
+            _entries[key] = _order.AddFirst((key, value));
+        }
+    }
+
+    /// <summary>
+    /// Removes a single entry. Returns true if it was present.
+    /// </summary>
+    public bool Remove(TKey key)
+    {
+        lock (_lock)
+        {
+            if (!_entries.Remove(key, out var node)) return false;
+
+            _order.Remove(node);
+            return true;
+        }
+    }
+
+    /// <summary>
+    /// Removes every entry whose value matches the predicate. Returns the number removed.
+    /// </summary>
+    public int RemoveWhere(Func<TValue, bool> predicate)
+    {
+        return TakeWhere(predicate).Count;
+    }
+
+    /// <summary>
+    /// Removes every entry whose value matches the predicate and returns the removed entries.
+    /// </summary>
+    public List<KeyValuePair<TKey, TValue>> TakeWhere(Func<TValue, bool> predicate)
+    {
+        lock (_lock)
+        {
+            var removed = new List<KeyValuePair<TKey, TValue>>();
+            var node = _order.First;
+            while (node != null)
+            {
+                var next = node.Next;
+                if (predicate(node.Value.Value))
+                {
+                    _order.Remove(node);
+                    _entries.Remove(node.Value.Key);
+                    removed.Add(new KeyValuePair<TKey, TValue>(node.Value.Key, node.Value.Value));
+                }
+                node = next;
+            }
+            return removed;
+        }
+    }
+}
@@ -16,6 +16,9 @@ public class SettingsService
     private readonly object _lock = new();
     private string _moderationPassword;
     
+    private static readonly JsonSerializerOptions ReadJsonOptions = new() { PropertyNameCaseInsensitive = true };
+    private static readonly JsonSerializerOptions WriteJsonOptions = new() { WriteIndented = true };
+    
     public SettingsService(ILogger<SettingsService> logger)
     {
         _logger = logger;
@@ -64,10 +67,7 @@ public class SettingsService
             if (File.Exists(_settingsPath))
             {
                 var json = File.ReadAllText(_settingsPath);
-                var settings = JsonSerializer.Deserialize<AppSettings>(json, new JsonSerializerOptions
-                {
-                    PropertyNameCaseInsensitive = true
-                });
+                var settings = JsonSerializer.Deserialize<AppSettings>(json, ReadJsonOptions);
                 
                 if (settings != null)
                 {
@@ -93,10 +93,7 @@ public class SettingsService
         {
             try
             {
-                var json = JsonSerializer.Serialize(_settings, new JsonSerializerOptions
-                {
-                    WriteIndented = true
-                });
+                var json = JsonSerializer.Serialize(_settings, WriteJsonOptions);
                 File.WriteAllText(_settingsPath, json);
                 _logger.LogInformation("Settings saved to {Path}", _settingsPath);
             }
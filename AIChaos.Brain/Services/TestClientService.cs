@@ -12,13 +12,14 @@ public class TestClientService
 {
     private readonly SettingsService _settingsService;
     private readonly IHttpClientFactory _httpClientFactory;
+    private readonly AiCodeGeneratorService _codeGenerator;
     private readonly ILogger<TestClientService> _logger;
     
     // Queue for commands waiting to be tested (original prompt, current code, attempt count)
-    private readonly List<TestQueueItem> _testQueue = new();
+    private readonly LinkedList<TestQueueItem> _testQueue = new(); // Fixed code retries jump to the front
     
     // Commands that passed testing and are ready for main client
-    private readonly List<(int CommandId, string Code)> _approvedQueue = new();
+    private readonly Queue<(int CommandId, string Code)> _approvedQueue = new();
     
     // Track which commands are currently being tested
     private readonly Dictionary<int, PendingTest> _pendingTests = new();
@@ -53,10 +54,11 @@ public class TestClientService
         The code should be ready to execute directly.
         """;
     
-    public TestClientService(SettingsService settingsService, IHttpClientFactory httpClientFactory, ILogger<TestClientService> logger)
+    public TestClientService(SettingsService settingsService, IHttpClientFactory httpClientFactory, AiCodeGeneratorService codeGenerator, ILogger<TestClientService> logger)
     {
         _settingsService = settingsService;
         _httpClientFactory = httpClientFactory;
+        _codeGenerator = codeGenerator;
         _logger = logger;
     }
     
@@ -89,15 +91,16 @@ public class TestClientService
             if (!IsEnabled)
             {
                 // If test client mode is disabled, skip testing
-                _approvedQueue.Add((commandId, code));
+                _approvedQueue.Enqueue((commandId, code));
                 return;
             }
             
             var settings = _settingsService.Settings.TestClient;
-            _testQueue.Add(new TestQueueItem
+            _testQueue.AddLast(new TestQueueItem
             {
                 CommandId = commandId,
                 OriginalPrompt = originalPrompt,
+                OriginalCode = code,
                 CurrentCode = code,
                 CleanupAfterTest = settings.CleanupAfterTest,
                 AttemptCount = 0
@@ -121,14 +124,15 @@ public class TestClientService
                 return null;
             }
             
-            var item = _testQueue[0];
-            _testQueue.RemoveAt(0);
+            var item = _testQueue.First!.Value;
+            _testQueue.RemoveFirst();
             
             // Track pending test
             _pendingTests[item.CommandId] = new PendingTest
             {
                 CommandId = item.CommandId,
                 OriginalPrompt = item.OriginalPrompt,
+                OriginalCode = item.OriginalCode,
                 CurrentCode = item.CurrentCode,
                 StartedAt = DateTime.UtcNow,
                 TimeoutSeconds = _settingsService.Settings.TestClient.TimeoutSeconds,
@@ -175,7 +179,13 @@ public class TestClientService
             // Test passed! Queue for main client
             lock (_lock)
             {
-                _approvedQueue.Add((commandId, pending.CurrentCode));
+                _approvedQueue.Enqueue((commandId, pending.CurrentCode));
+            }
+            
+            // If the AI had to fix the code, cache the working version for the next identical request
+            if (pending.CurrentCode != pending.OriginalCode)
+            {
+                _codeGenerator.ReplaceCachedCode(pending.OriginalCode, pending.CurrentCode);
             }
             _logger.LogInformation("[TEST CLIENT] Command #{CommandId} PASSED testing after {Attempts} attempt(s) - queued for main client", 
                 commandId, pending.AttemptCount);
@@ -183,6 +193,9 @@ public class TestClientService
         }
         else
         {
+            // Don't serve the failing code from the response cache while it's being fixed
+            _codeGenerator.InvalidateCachedCode(pending.CurrentCode);
+            
             // Test failed - check if we can retry with AI fix
             if (pending.AttemptCount < MaxFixAttempts)
             {
@@ -199,10 +212,11 @@ public class TestClientService
                         // Re-queue with fixed code
                         lock (_lock)
                         {
-                            _testQueue.Insert(0, new TestQueueItem
+                            _testQueue.AddFirst(new TestQueueItem
                             {
                                 CommandId = commandId,
                                 OriginalPrompt = pending.OriginalPrompt,
+                                OriginalCode = pending.OriginalCode,
                                 CurrentCode = fixedCode,
                                 CleanupAfterTest = pending.CleanupAfterTest,
                                 AttemptCount = pending.AttemptCount
@@ -287,7 +301,7 @@ public class TestClientService
         
         request.Headers.Add("Authorization", $"Bearer {settings.OpenRouter.ApiKey}");
         
-        var httpClient = _httpClientFactory.CreateClient();
+        var httpClient = _httpClientFactory.CreateClient(Constants.OpenRouterHttpClient);
         var response = await httpClient.SendAsync(request);
         
         if (!response.IsSuccessStatusCode)
@@ -359,8 +373,7 @@ public class TestClientService
                 return null;
             }
             
-            var result = _approvedQueue[0];
-            _approvedQueue.RemoveAt(0);
+            var result = _approvedQueue.Dequeue();
             return result;
         }
     }
@@ -451,6 +464,7 @@ public class TestClientService
     {
         public int CommandId { get; set; }
         public string OriginalPrompt { get; set; } = "";
+        public string OriginalCode { get; set; } = "";
         public string CurrentCode { get; set; } = "";
         public DateTime StartedAt { get; set; }
         public int TimeoutSeconds { get; set; }
@@ -462,6 +476,7 @@ public class TestClientService
     {
         public int CommandId { get; set; }
         public string OriginalPrompt { get; set; } = "";
+        public string OriginalCode { get; set; } = "";
         public string CurrentCode { get; set; } = "";
         public bool CleanupAfterTest { get; set; }
         public int AttemptCount { get; set; }
@@ -0,0 +1,67 @@
+using System.Net;
+
+namespace AIChaos.Brain.Services;
+
+/// <summary>
+/// Retries requests that fail with a transient status (429, 502, 503, 504) or a dropped connection,
+/// backing off exponentially between attempts.
+/// </summary>
+public class TransientRetryHandler : DelegatingHandler
+{
+    private static readonly HashSet<HttpStatusCode> RetryableStatusCodes =
+    [
+        HttpStatusCode.TooManyRequests,
+        HttpStatusCode.BadGateway,
+        HttpStatusCode.ServiceUnavailable,
+        HttpStatusCode.GatewayTimeout
+    ];
+
+    // Never wait longer than this between attempts, even if the server asks for more via Retry-After
+    private static readonly TimeSpan MaxDelay = TimeSpan.FromSeconds(10);
+
+    private readonly int _maxRetries;
+    private readonly TimeSpan _baseDelay;
+
+    public TransientRetryHandler(int maxRetries = 3, TimeSpan? baseDelay = null)
+    {
+        if (maxRetries < 0)
+        {
+            throw new ArgumentOutOfRangeException(nameof(maxRetries), "Retry count cannot be negative");
+        }
+
+        _maxRetries = maxRetries;
+        _baseDelay = baseDelay ?? TimeSpan.FromMilliseconds(300);
+    }
+
+    protected override async Task<HttpResponseMessage> SendAsync(HttpRequestMessage request, CancellationToken cancellationToken)
+    {
+        for (var attempt = 0; ; attempt++)
+        {
+            HttpResponseMessage response;
+            try
+            {
+                response = await base.SendAsync(request, cancellationToken);
+            }
+            catch (HttpRequestException) when (attempt < _maxRetries && !cancellationToken.IsCancellationRequested)
+            {
+                await Task.Delay(GetDelay(attempt, null), cancellationToken);
+                continue;
+            }
+
+            if (attempt >= _maxRetries || !RetryableStatusCodes.Contains(response.StatusCode))
+            {
+                return response;
+            }
+
+            var delay = GetDelay(attempt, response.Headers.RetryAfter?.Delta);
+            response.Dispose();
+            await Task.Delay(delay, cancellationToken);
+        }
+    }
+
+    private TimeSpan GetDelay(int attempt, TimeSpan? retryAfter)
+    {
+        var delay = retryAfter ?? _baseDelay * Math.Pow(2, attempt);
+        return delay < MaxDelay ? delay : MaxDelay;
+    }
+}
@@ -1,4 +1,6 @@
+using System.Collections.Concurrent;
 using System.Text.RegularExpressions;
+using System.Threading.Channels;
 using AIChaos.Brain.Models;
 using TwitchLib.Client;
 using TwitchLib.Client.Events;
@@ -19,7 +21,16 @@ public partial class TwitchService : IDisposable
     private readonly ILogger<TwitchService> _logger;
     
     private TwitchClient? _client;
-    private readonly Dictionary<string, DateTime> _cooldowns = new();
+    // Messages can be handled on several threads at once, so cooldowns are checked and claimed atomically
+    private readonly ConcurrentDictionary<string, DateTime> _cooldowns = new(StringComparer.OrdinalIgnoreCase);
+    
+    // Chat commands are validated on the message event and handed to a fixed pool of workers,
+    // so a burst of chatters can't start an unbounded number of concurrent generations
+    private const int CommandQueueCapacity = 64;
+    private const int CommandWorkerCount = 4;
+    private readonly Channel<(string Username, string Prompt, DateTime CooldownClaimedAt)> _pendingCommands =
+        Channel.CreateBounded<(string Username, string Prompt, DateTime CooldownClaimedAt)>(CommandQueueCapacity);
+    private readonly CancellationTokenSource _workerCts = new();
     
     public bool IsConnected => _client?.IsConnected ?? false;
     public string? ConnectedChannel { get; private set; }
@@ -34,6 +45,11 @@ public partial class TwitchService : IDisposable
         _commandQueue = commandQueue;
         _codeGenerator = codeGenerator;
         _logger = logger;
+        
+        for (var i = 0; i < CommandWorkerCount; i++)
+        {
+            _ = Task.Run(() => ProcessPendingCommandsAsync(_workerCts.Token));
+        }
     }
     
     /// <summary>
@@ -112,7 +128,7 @@ public partial class TwitchService : IDisposable
         _logger.LogInformation("Twitch client connected as {BotUsername}", e.BotUsername);
     }
     
-    private async void OnMessageReceived(object? sender, OnMessageReceivedArgs e)
+    private void OnMessageReceived(object? sender, OnMessageReceivedArgs e)
     {
         var settings = _settingsService.Settings.Twitch;
         var message = e.ChatMessage;
@@ -146,8 +162,8 @@ public partial class TwitchService : IDisposable
             return;
         }
         
-        // Check cooldown
-        if (IsOnCooldown(username, settings.CooldownSeconds))
+        // Check and claim the cooldown in one step so concurrent messages can't both pass
+        if (!TryClaimCooldown(username, settings.CooldownSeconds, out var cooldownClaimedAt))
         {
             _logger.LogInformation("[Twitch] User {Username} is on cooldown", username);
             return;
@@ -157,6 +173,37 @@ public partial class TwitchService : IDisposable
         var isMod = message.IsModerator || message.IsBroadcaster;
         var filteredPrompt = FilterUrls(prompt, isMod, _settingsService.Settings.Safety);
         
+        if (!_pendingCommands.Writer.TryWrite((username, filteredPrompt, cooldownClaimedAt)))
+        {
+            _logger.LogWarning("[Twitch] Command queue full, dropping command from {Username}", username);
+            ReleaseCooldown(username, cooldownClaimedAt);
+        }
+    }
+    
+    private async Task ProcessPendingCommandsAsync(CancellationToken cancellationToken)
+    {
+        try
+        {
+            await foreach (var (username, prompt, cooldownClaimedAt) in _pendingCommands.Reader.ReadAllAsync(cancellationToken))
+            {
+                if (!await ProcessCommandAsync(username, prompt))
+                {
+                    // Nothing was queued, so let the chatter try again straight away
+                    ReleaseCooldown(username, cooldownClaimedAt);
+                }
+            }
+        }
+        catch (OperationCanceledException)
+        {
+            // Service is shutting down
+        }
+    }
+    
+    /// <summary>
+    /// Generates code for a chat command and queues it. Returns false if nothing was queued.
+    /// </summary>
+    private async Task<bool> ProcessCommandAsync(string username, string filteredPrompt)
+    {
         // Generate and queue the code
         try
         {
@@ -166,7 +213,7 @@ public partial class TwitchService : IDisposable
             if (ContainsDangerousPatterns(executionCode))
             {
                 _logger.LogWarning("[Twitch] Blocked dangerous code from {Username}", username);
-                return;
+                return false;
             }
             
             _commandQueue.AddCommand(
@@ -176,12 +223,13 @@ public partial class TwitchService : IDisposable
                 "twitch", 
                 username);
             
-            SetCooldown(username);
             _logger.LogInformation("[Twitch] Command queued from {Username}: {Prompt}", username, filteredPrompt);
+            return true;
         }
         catch (Exception ex)
         {
             _logger.LogError(ex, "[Twitch] Failed to process command from {Username}", username);
+            return false;
         }
     }
     
@@ -190,18 +238,36 @@ public partial class TwitchService : IDisposable
         _logger.LogError(e.Exception, "Twitch client error");
     }
     
-    private bool IsOnCooldown(string username, int cooldownSeconds)
+    /// <summary>
+    /// Starts the user's cooldown if it has expired. Returns false if the user is still on cooldown.
+    /// </summary>
+    private bool TryClaimCooldown(string username, int cooldownSeconds, out DateTime claimedAt)
     {
-        if (_cooldowns.TryGetValue(username.ToLowerInvariant(), out var lastCommand))
+        claimedAt = DateTime.UtcNow;
+        while (true)
         {
-            return (DateTime.UtcNow - lastCommand).TotalSeconds < cooldownSeconds;
+            if (!_cooldowns.TryGetValue(username, out var lastCommand))
+            {
+                if (_cooldowns.TryAdd(username, claimedAt)) return true;
+                continue;
+            }
+            
+            if ((claimedAt - lastCommand).TotalSeconds < cooldownSeconds)
+            {
+                return false;
+            }
+            
+            // Only succeeds if no other message claimed the cooldown since we read it
+            if (_cooldowns.TryUpdate(username, claimedAt, lastCommand)) return true;
         }
-        return false;
     }
     
-    private void SetCooldown(string username)
+    /// <summary>
+    /// Gives back a cooldown claimed for a command that was never queued.
+    /// </summary>
+    private void ReleaseCooldown(string username, DateTime claimedAt)
     {
-        _cooldowns[username.ToLowerInvariant()] = DateTime.UtcNow;
+        _cooldowns.TryRemove(new KeyValuePair<string, DateTime>(username, claimedAt));
     }
     
     private static string FilterUrls(string message, bool isMod, SafetySettings safety)
@@ -211,54 +277,34 @@ public partial class TwitchService : IDisposable
             return message;
         }
         
-        var urlPattern = UrlRegex();
-        var matches = urlPattern.Matches(message);
-        var filtered = message;
-        
-        foreach (Match match in matches)
+        // Replace matches in a single pass so a URL that prefixes another can't corrupt the message
+        return UrlRegex().Replace(message, match =>
         {
-            var url = match.Value;
-            try
-            {
-                var uri = new Uri(url);
-                var domain = uri.Host.ToLowerInvariant();
-                
-                var isAllowed = safety.AllowedDomains.Any(d => 
-                    domain.Contains(d, StringComparison.OrdinalIgnoreCase));
-                
-                if (!isAllowed)
-                {
-                    filtered = filtered.Replace(url, "[URL REMOVED]");
-                }
-            }
-            catch
+            if (!Uri.TryCreate(match.Value, UriKind.Absolute, out var uri))
             {
-                filtered = filtered.Replace(url, "[URL REMOVED]");
+                return "[URL REMOVED]";
             }
-        }
-        
-        return filtered;
+            
+            return safety.IsDomainAllowed(uri.Host) ? match.Value : "[URL REMOVED]";
+        });
     }
     
     private static bool ContainsDangerousPatterns(string code)
     {
-        var dangerousPatterns = new[]
-        {
-            "changelevel",
-            @"RunConsoleCommand.*""map""",
-            @"RunConsoleCommand.*'map'",
-            @"game\.ConsoleCommand.*map"
-        };
-        
-        return dangerousPatterns.Any(pattern => 
-            Regex.IsMatch(code, pattern, RegexOptions.IgnoreCase));
+        return DangerousPatternRegex().IsMatch(code);
     }
     
-    [GeneratedRegex(@"http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+")]
+    // All blocked patterns fused into one alternation so the code is scanned once
+    [GeneratedRegex(@"changelevel|RunConsoleCommand.*(?:""map""|'map')|game\.ConsoleCommand.*map", RegexOptions.IgnoreCase)]
+    private static partial Regex DangerousPatternRegex();
+    
+    [GeneratedRegex(@"https?://[^\s]+", RegexOptions.IgnoreCase)]
     private static partial Regex UrlRegex();
     
     public void Dispose()
     {
+        _workerCts.Cancel();
+        _pendingCommands.Writer.TryComplete();
         Disconnect();
         GC.SuppressFinalize(this);
     }
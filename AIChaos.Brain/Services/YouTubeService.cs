@@ -389,50 +389,28 @@ public partial class YouTubeService : IDisposable
             return message;
         }
 
-        var urlPattern = UrlRegex();
-        var matches = urlPattern.Matches(message);
-        var filtered = message;
-
-        foreach (Match match in matches)
+        // Replace matches in a single pass so a URL that prefixes another can't corrupt the message
+        return UrlRegex().Replace(message, match =>
         {
-            var url = match.Value;
-            try
+            if (!Uri.TryCreate(match.Value, UriKind.Absolute, out var uri))
             {
-                var uri = new Uri(url);
-                var domain = uri.Host.ToLowerInvariant();
-
-                var isAllowed = safety.AllowedDomains.Any(d =>
-                    domain.Contains(d, StringComparison.OrdinalIgnoreCase));
-
-                if (!isAllowed)
-                {
-                    filtered = filtered.Replace(url, "[URL REMOVED]");
-                }
+                return "[URL REMOVED]";
             }
-            catch
-            {
-                filtered = filtered.Replace(url, "[URL REMOVED]");
-            }
-        }
 
-        return filtered;
+            return safety.IsDomainAllowed(uri.Host) ? match.Value : "[URL REMOVED]";
+        });
     }
 
     private static bool ContainsDangerousPatterns(string code)
     {
-        var dangerousPatterns = new[]
-        {
-            "changelevel",
-            @"RunConsoleCommand.*""map""",
-            @"RunConsoleCommand.*'map'",
-            @"game\.ConsoleCommand.*map"
-        };
-
-        return dangerousPatterns.Any(pattern =>
-            Regex.IsMatch(code, pattern, RegexOptions.IgnoreCase));
+        return DangerousPatternRegex().IsMatch(code);
     }
 
-    [GeneratedRegex(@"http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+")]
+    // All blocked patterns fused into one alternation so the code is scanned once
+    [GeneratedRegex(@"changelevel|RunConsoleCommand.*(?:""map""|'map')|game\.ConsoleCommand.*map", RegexOptions.IgnoreCase)]
+    private static partial Regex DangerousPatternRegex();
+
+    [GeneratedRegex(@"https?://[^\s]+", RegexOptions.IgnoreCase)]
     private static partial Regex UrlRegex();
 
     public void Dispose()